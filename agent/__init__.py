@@ -1,12 +1,33 @@
-from .contract_analyzer import ContractAnalyzer
-from .gigachat_client import GigaChatClient
-from .tools import FileProcessor, ContractValidator
-from .law_parser import LawParser
-
 __all__ = [
     'ContractAnalyzer',
     'GigaChatClient',
     'FileProcessor',
     'ContractValidator',
     'LawParser'
-]
\ No newline at end of file
+]
+
+# Откуда импортировать каждый публичный класс
+_LAZY_IMPORTS = {
+    'ContractAnalyzer': 'contract_analyzer',
+    'GigaChatClient': 'gigachat_client',
+    'FileProcessor': 'tools',
+    'ContractValidator': 'tools',
+    'LawParser': 'law_parser',
+}
+
+
+def __getattr__(name):
+    """Ленивая загрузка модулей пакета (PEP 562).
+
+    Тяжелые зависимости (langchain, GigaChat) импортируются только при
+    первом обращении к соответствующему классу - скрипты, которым нужен
+    лишь LawParser или FileProcessor, стартуют без них.
+    """
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    value = getattr(import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # Следующие обращения идут без __getattr__
+    return value
@@ -1,5 +1,6 @@
-import os
 import json
+import time
+import asyncio
 from typing import Dict, List, Any
 from .tools import FileProcessor, ContractValidator
 from .gigachat_client import GigaChatClient
@@ -13,16 +14,93 @@ class ContractAnalyzer:
         self.giga_client = GigaChatClient()
         self.law_parser = LawParser("laws")  # Инициализируем парсер законов
 
-    def analyze_contract(self, contract_path: str, notice_path: str = None, law_type: str = "44-ФЗ") -> Dict[str, Any]:
-        """Основной метод анализа контракта с использованием текстов законов"""
-
-        # Извлекаем текст из контракта
-        contract_text = self.file_processor.extract_text(contract_path)
+        # Готовые фрагменты статей для контекста закона
+        self._article_snippet_cache: Dict = {}
+
+    def _extract_text(self, path: str) -> str:
+        """Извлекает текст файла; кэширование живет в FileProcessor"""
+        return self.file_processor.extract_text(path)
+
+    def analyze_contract(self, contract_path: str = None, notice_path: str = None,
+                         law_type: str = "44-ФЗ", contract_bytes: bytes = None,
+                         notice_bytes: bytes = None, contract_text: str = None,
+                         notice_text: str = None) -> Dict[str, Any]:
+        """Основной метод анализа контракта с использованием текстов законов.
+
+        Если текст уже извлечен вызывающим кодом (contract_text /
+        notice_text), он используется напрямую. Иначе при наличии
+        contract_bytes / notice_bytes (например, из веб-загрузки) текст
+        извлекается прямо из памяти, без повторного чтения с диска;
+        путь тогда используется только как подсказка формата.
+        """
+
+        # Извлекаем текст из контракта, если он не передан готовым
+        if contract_text is None:
+            if contract_bytes is not None:
+                contract_text = self.file_processor.extract_text_bytes(contract_bytes, contract_path or '')
+            else:
+                contract_text = self._extract_text(contract_path)
 
         # Извлекаем текст из извещения если оно есть
-        notice_text = None
+        if notice_text is None:
+            if notice_bytes is not None:
+                notice_text = self.file_processor.extract_text_bytes(notice_bytes, notice_path or '')
+            elif notice_path:
+                notice_text = self._extract_text(notice_path)
+
+        return self._analyze_texts(contract_text, notice_text, law_type)
+
+    async def aanalyze_contract(self, contract_path: str, notice_path: str = None,
+                                law_type: str = "44-ФЗ") -> Dict[str, Any]:
+        """Асинхронный анализ контракта.
+
+        Тексты контракта и извещения извлекаются параллельно в отдельных
+        потоках - парсинг PDF/DOCX идет в C-коде и не держит GIL.
+        """
         if notice_path:
-            notice_text = self.file_processor.extract_text(notice_path)
+            contract_text, notice_text = await asyncio.gather(
+                asyncio.to_thread(self._extract_text, contract_path),
+                asyncio.to_thread(self._extract_text, notice_path)
+            )
+        else:
+            contract_text = await asyncio.to_thread(self._extract_text, contract_path)
+            notice_text = None
+
+        return await self._aanalyze_texts(contract_text, notice_text, law_type)
+
+    async def _aanalyze_texts(self, contract_text: str, notice_text: str, law_type: str) -> Dict[str, Any]:
+        """Асинхронный анализ извлеченных текстов.
+
+        Запрос к GigaChat уходит первым, локальные проверки выполняются,
+        пока ждем ответ: общее время равно максимуму из двух, а не сумме.
+        """
+        relevant_articles = self.law_parser.get_relevant_articles_for_contract(contract_text, law_type)
+        law_context = self._prepare_law_context(relevant_articles, law_type)
+
+        ai_task = asyncio.create_task(self.giga_client.aanalyze_contract(
+            contract_text=contract_text,
+            notice_text=notice_text,
+            law_type=law_type,
+            law_context=law_context
+        ))
+
+        # Валидация идет в рабочем потоке: await отдает управление циклу
+        # событий, и запрос к GigaChat реально стартует, а не ждет очереди
+        basic_analysis = await asyncio.to_thread(
+            self.validator.basic_validation, contract_text, law_type)
+
+        comparison = {'mismatches': [], 'parameters_compared': []}
+        if notice_text:
+            comparison = await asyncio.to_thread(
+                self.validator.compare_with_notice, contract_text, notice_text)
+
+        ai_analysis = await ai_task
+
+        return self._build_result(basic_analysis, comparison, ai_analysis,
+                                  relevant_articles, law_type, notice_text)
+
+    def _analyze_texts(self, contract_text: str, notice_text: str, law_type: str) -> Dict[str, Any]:
+        """Анализ уже извлеченных текстов контракта и извещения"""
 
         # Получаем релевантные статьи закона
         relevant_articles = self.law_parser.get_relevant_articles_for_contract(contract_text, law_type)
@@ -46,7 +124,13 @@ class ContractAnalyzer:
             law_context=law_context  # Передаем контекст закона
         )
 
-        # Формируем итоговый отчет
+        return self._build_result(basic_analysis, comparison, ai_analysis,
+                                  relevant_articles, law_type, notice_text)
+
+    def _build_result(self, basic_analysis: Dict[str, Any], comparison: Dict[str, Any],
+                      ai_analysis: Dict[str, Any], relevant_articles: List,
+                      law_type: str, notice_text: str) -> Dict[str, Any]:
+        """Формирует итоговый отчет по результатам всех проверок"""
         result = {
             'basic_analysis': basic_analysis,
             'comparison': comparison,
@@ -62,34 +146,43 @@ class ContractAnalyzer:
 
         return result
 
+    def _article_snippet(self, article, law_type: str) -> str:
+        """Возвращает мемоизированный фрагмент статьи для контекста закона"""
+        key = (law_type, article.number)
+        snippet = self._article_snippet_cache.get(key)
+        if snippet is None:
+            snippet = (f"Статья {article.number}. {article.title}\n"
+                       f"Содержание: {article.content[:500]}...")
+            self._article_snippet_cache[key] = snippet
+        return snippet
+
     def _prepare_law_context(self, articles: List, law_type: str) -> str:
         """Подготавливает контекст закона для передачи в AI"""
         if not articles:
             return f"Контракт анализируется на соответствие {law_type}. Конкретные статьи не найдены."
 
-        context = f"Релевантные статьи {law_type} для анализа:\n\n"
-        for i, article in enumerate(articles[:5], 1):  # Ограничиваем количество статей
-            context += f"Статья {article.number}. {article.title}\n"
-            context += f"Содержание: {article.content[:500]}...\n\n"
-
-        return context
+        # Ограничиваем количество статей; фрагменты берутся из кэша,
+        # итог собирается одним join без наращивания строки
+        parts = [self._article_snippet(article, law_type) for article in articles[:5]]
+        return f"Релевантные статьи {law_type} для анализа:\n\n" + "\n\n".join(parts) + "\n\n"
 
     def _generate_summary(self, basic: Dict[str, Any], comparison: Dict[str, Any], ai: Dict[str, Any]) -> Dict[
         str, Any]:
         """Генерирует сводку по результатам анализа"""
+        errors = basic.get('errors') or ()
         total_issues = (
-                len(basic.get('errors', [])) +
-                len(comparison.get('mismatches', [])) +
-                len(ai.get('issues', []))
+                len(errors) +
+                len(comparison.get('mismatches') or ()) +
+                len(ai.get('issues') or ())
         )
 
         return {
             'total_issues': total_issues,
-            'critical_issues': len([issue for issue in basic.get('errors', []) if issue.get('severity') == 'critical']),
+            # Генератор вместо временного списка - без лишней аллокации
+            'critical_issues': sum(1 for issue in errors if issue.get('severity') == 'critical'),
             'recommendations': ai.get('recommendations', []),
             'status': 'high_risk' if total_issues > 5 else 'medium_risk' if total_issues > 0 else 'low_risk'
         }
 
     def _get_timestamp(self) -> str:
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
+        return time.strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
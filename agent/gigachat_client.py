@@ -1,23 +1,265 @@
 import os
 import json
-from typing import Dict, List, Any
-from langchain_gigachat.chat_models import GigaChat
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
 
+# Тяжелые импорты langchain / GigaChat отложены до первого создания
+# клиента (см. _get_model и __init__) - импорт модуля остается легким
 
-class GigaChatClient:
-    def __init__(self):
-        self.model = GigaChat(
+try:
+    import orjson  # C-парсер JSON, заметно быстрее stdlib на больших ответах
+except ImportError:
+    orjson = None
+
+try:
+    import tiktoken  # Опциональный токенизатор для обрезки текста по токенам
+except ImportError:
+    tiktoken = None
+
+try:
+    import regex as _regex  # Модуль regex умеет рекурсивные группы (?R)
+except ImportError:
+    _regex = None
+
+# Сбалансированный JSON-объект: строки пропускаются целиком, чтобы
+# фигурные скобки внутри значений не ломали баланс. Компилируется
+# один раз при импорте модуля.
+if _regex is not None:
+    _JSON_RE = _regex.compile(r'\{(?:[^{}"]|"(?:[^"\\]|\\.)*"|(?R))*\}', _regex.DOTALL)
+else:
+    _JSON_RE = None
+
+
+def _extract_json_object(s: str) -> Optional[str]:
+    """Возвращает первый сбалансированный JSON-объект из строки.
+
+    С установленным модулем regex поиск идет одной прекомпилированной
+    рекурсивной маской в C-коде; иначе - линейный проход на Python
+    со счетчиком вложенности. Оба варианта, в отличие от прежней пары
+    find('{') / rfind('}'), не ломаются на фигурных скобках
+    в пояснительном тексте вокруг JSON.
+    """
+    if _JSON_RE is not None:
+        m = _JSON_RE.search(s)
+        return m.group(0) if m else None
+
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(s):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            if depth:
+                in_string = True
+        elif ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+
+    return None
+
+
+def _loads(json_str: str) -> Dict[str, Any]:
+    """Разбирает JSON через orjson, с откатом на stdlib json"""
+    if orjson is not None:
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
+
+
+def _iter_issue_objects(buf: str):
+    """Выдает завершенные объекты массива issues из частичного JSON-ответа.
+
+    Позволяет разбирать ответ инкрементально, пока модель еще дописывает
+    хвост: объект отдается, как только его скобки сбалансировались.
+    """
+    idx = buf.find('"issues"')
+    if idx == -1:
+        return
+
+    start = buf.find('[', idx)
+    if start == -1:
+        return
+
+    pos = start + 1
+    while True:
+        brace = buf.find('{', pos)
+        closer = buf.find(']', pos)
+        if brace == -1 or (closer != -1 and closer < brace):
+            return  # Массив закрыт или следующий объект еще не начался
+
+        obj = _extract_json_object(buf[brace:])
+        if obj is None:
+            return  # Объект пока не дописан
+
+        try:
+            yield _loads(obj)
+        except Exception:
+            return
+
+        pos = brace + len(obj)
+
+
+def _dumps(obj) -> str:
+    """Сериализует объект в компактный JSON для вставки в промпт.
+
+    В отличие от str(dict), JSON не содержит одинарных кавычек, None
+    и юникод-эскейпов - меньше токенов и однозначный формат для модели.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+# Модели GigaChat по учетным данным: один клиент (и его пул соединений /
+# TLS-сессия) на процесс, а не на каждый экземпляр GigaChatClient
+_MODEL_SINGLETONS: Dict[str, Any] = {}
+
+
+def _get_model(credentials: str):
+    """Возвращает общий экземпляр GigaChat для данных учетных данных"""
+    from langchain_gigachat.chat_models import GigaChat
+
+    key = credentials or ''
+    model = _MODEL_SINGLETONS.get(key)
+    if model is None:
+        model = GigaChat(
             model="GigaChat-2-Max",
             verify_ssl_certs=False,
-            credentials=os.getenv("GIGACHAT_CREDENTIALS")
+            credentials=credentials
         )
+        _MODEL_SINGLETONS[key] = model
+    return model
+
+
+class GigaChatClient:
+    # Кэш ответов GigaChat по содержимому запроса
+    _CACHE_DIR = ".gigachat_cache"
+    _CACHE_MAX_ENTRIES = 256
+
+    # Бюджеты входа: в токенах при наличии токенизатора, в символах - без него
+    _CONTRACT_BUDGET = (6000, 12000)  # (токены, символы)
+    _NOTICE_BUDGET = (4000, 8000)
+
+    def __init__(self):
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import ChatPromptTemplate
+
+        self.model = _get_model(os.getenv("GIGACHAT_CREDENTIALS"))
         self.parser = StrOutputParser()
+        self._response_cache: OrderedDict = OrderedDict()
 
-    def analyze_contract(self, contract_text: str, notice_text: str = None,
-                         law_type: str = "44-ФЗ", law_context: str = None) -> Dict[str, Any]:
-        """Анализ контракта с помощью GigaChat с учетом текстов законов"""
+        if tiktoken is not None:
+            self._tokenizer = tiktoken.get_encoding("cl100k_base")
+        else:
+            self._tokenizer = None
+
+        # Шаблоны и цепочки собираются один раз при создании клиента,
+        # а не на каждый вызов analyze_contract / ask_question
+        self._chain_with_notice = (
+            ChatPromptTemplate.from_template(self._build_prompt_template(True))
+            | self.model | self.parser
+        )
+        self._chain_no_notice = (
+            ChatPromptTemplate.from_template(self._build_prompt_template(False))
+            | self.model | self.parser
+        )
+        self._chain_question = (
+            ChatPromptTemplate.from_template(self._QUESTION_TEMPLATE)
+            | self.model | self.parser
+        )
+
+    def _get_chain(self, has_notice: bool):
+        """Возвращает заранее собранную цепочку под нужный шаблон"""
+        return self._chain_with_notice if has_notice else self._chain_no_notice
+
+    def _clip(self, text: str, budget) -> str:
+        """Обрезает текст по бюджету токенов, а не символов.
+
+        Срез по символам либо недоиспользует контекст, либо рвет текст
+        посреди слова; токенизатор режет ровно по границе бюджета.
+        Без tiktoken сохраняется прежний срез по символам.
+        """
+        n_tokens, n_chars = budget
+        if self._tokenizer is None:
+            return text[:n_chars]
+
+        ids = self._tokenizer.encode(text)
+        if len(ids) <= n_tokens:
+            return text
+        return self._tokenizer.decode(ids[:n_tokens])
+
+    def _cache_key(self, contract_text: str, notice_text: str = None,
+                   law_type: str = "44-ФЗ", law_context: str = None) -> str:
+        """Ключ кэша по хэшу содержимого запроса"""
+        # Хэшируются те же срезы, что уходят в промпт: с tiktoken клип
+        # по токенам может выходить за 12000 символов, и ключ по сырому
+        # префиксу склеивал бы разные промпты в одну запись кэша
+        raw = (f"{law_type}|{law_context or ''}|"
+               f"{self._clip(contract_text, self._CONTRACT_BUDGET)}|"
+               f"{self._clip(notice_text or '', self._NOTICE_BUDGET)}")
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Dict[str, Any]:
+        """Ищет готовый ответ в памяти, затем на диске"""
+        if key in self._response_cache:
+            self._response_cache.move_to_end(key)
+            return self._response_cache[key]
+
+        cache_file = os.path.join(self._CACHE_DIR, key + '.json')
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                self._response_cache[key] = result
+                return result
+            except Exception:
+                pass
+
+        return None
+
+    @staticmethod
+    def _is_parse_error(result: Dict[str, Any]) -> bool:
+        """True, если result - заглушка о нераспознанном ответе модели"""
+        issues = result.get("issues")
+        return bool(issues) and issues[0].get("type") == "parse_error"
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        """Сохраняет ответ в памяти и на диске"""
+        self._response_cache[key] = result
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self._CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+
+        try:
+            os.makedirs(self._CACHE_DIR, exist_ok=True)
+            with open(os.path.join(self._CACHE_DIR, key + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"GigaChat cache write error: {e}")
+
+    def _build_prompt_template(self, has_notice: bool) -> str:
+        """Собирает текст промпта в зависимости от наличия извещения"""
 
         # Базовый промпт с учетом контекста закона
         base_prompt = """
@@ -30,7 +272,7 @@ class GigaChatClient:
         {contract_text}
         """
 
-        if notice_text:
+        if has_notice:
             prompt_template = base_prompt + """
             ИЗВЕЩЕНИЕ О ЗАКУПКЕ:
             {notice_text}
@@ -80,51 +322,312 @@ class GigaChatClient:
             }}
             """
 
-        prompt = ChatPromptTemplate.from_template(prompt_template)
+        return prompt_template
+
+    def _build_invoke_data(self, contract_text: str, notice_text: str = None,
+                           law_type: str = "44-ФЗ", law_context: str = None) -> Dict[str, Any]:
+        """Формирует входные данные для цепочки"""
+        invoke_data = {
+            "law_type": law_type,
+            "law_context": law_context or f"Анализ на соответствие {law_type}",
+            "contract_text": self._clip(contract_text, self._CONTRACT_BUDGET),
+        }
+
+        if notice_text:
+            invoke_data["notice_text"] = self._clip(notice_text, self._NOTICE_BUDGET)
+
+        return invoke_data
+
+    def _api_error_result(self, e: Exception) -> Dict[str, Any]:
+        """Формирует ответ-заглушку при ошибке обращения к GigaChat"""
+        return {
+            "issues": [{
+                "type": "api_error",
+                "severity": "warning",
+                "description": f"Ошибка подключения к AI сервису: {str(e)}",
+                "law_reference": "",
+                "recommendation": "Проверьте интернет-соединение и учетные данные GigaChat"
+            }],
+            "recommendations": ["Проведите ручную проверку контракта"],
+            "summary": "AI анализ временно недоступен"
+        }
+
+    def analyze_contract(self, contract_text: str, notice_text: str = None,
+                         law_type: str = "44-ФЗ", law_context: str = None,
+                         force_refresh: bool = False) -> Dict[str, Any]:
+        """Анализ контракта с помощью GigaChat с учетом текстов законов.
+
+        Повторный анализ того же набора входных данных отдается из кэша
+        без обращения к GigaChat; force_refresh=True принудительно
+        перезапрашивает модель.
+        """
+        cache_key = self._cache_key(contract_text, notice_text, law_type, law_context)
+        if not force_refresh:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        chain = self._get_chain(notice_text is not None)
+
+        try:
+            response = chain.invoke(self._build_invoke_data(contract_text, notice_text, law_type, law_context))
+            result = self._parse_response(response)
+            # Заглушку о нераспознанном ответе не кэшируем: иначе один
+            # сбойный ответ модели навсегда закрепляется за этим контрактом
+            if not self._is_parse_error(result):
+                self._cache_put(cache_key, result)
+            return result
+
+        except Exception as e:
+            print(f"GigaChat analysis error: {e}")
+            return self._api_error_result(e)
+
+    async def aanalyze_contract(self, contract_text: str, notice_text: str = None,
+                                law_type: str = "44-ФЗ", law_context: str = None,
+                                force_refresh: bool = False) -> Dict[str, Any]:
+        """Асинхронный анализ контракта - не блокирует поток на время запроса к GigaChat"""
+        cache_key = self._cache_key(contract_text, notice_text, law_type, law_context)
+        if not force_refresh:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        chain = self._get_chain(notice_text is not None)
+
+        try:
+            response = await chain.ainvoke(self._build_invoke_data(contract_text, notice_text, law_type, law_context))
+            result = self._parse_response(response)
+            if not self._is_parse_error(result):
+                self._cache_put(cache_key, result)
+            return result
+
+        except Exception as e:
+            print(f"GigaChat analysis error: {e}")
+            return self._api_error_result(e)
+
+    async def aanalyze_contract_stream(self, contract_text: str, notice_text: str = None,
+                                       law_type: str = "44-ФЗ", law_context: str = None):
+        """Потоковый анализ контракта: выдает проблемы по мере генерации.
+
+        Асинхронный итератор словарей issue. Ответ модели читается через
+        chain.astream и разбирается инкрементально, поэтому первая
+        проблема доступна задолго до прихода последнего токена - UI может
+        отрисовывать результаты постепенно.
+        """
+        chain = self._get_chain(notice_text is not None)
+        invoke_data = self._build_invoke_data(contract_text, notice_text, law_type, law_context)
+
+        buf = ""
+        emitted = 0
+
+        try:
+            async for chunk in chain.astream(invoke_data):
+                buf += chunk
+
+                for i, issue in enumerate(_iter_issue_objects(buf)):
+                    if i < emitted:
+                        continue
+                    if 'law_reference' not in issue:
+                        issue['law_reference'] = ""
+                    emitted += 1
+                    yield issue
+
+        except Exception as e:
+            print(f"GigaChat streaming error: {e}")
+            for issue in self._api_error_result(e)['issues']:
+                yield issue
+
+    async def aanalyze_many(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Параллельный анализ списка контрактов через chain.abatch.
+
+        Каждый элемент items - словарь с ключами contract_text и, опционально,
+        notice_text, law_type, law_context. Запросы к GigaChat выполняются
+        конкурентно над общим пулом соединений; число одновременных запросов
+        ограничено переменной окружения GIGACHAT_CONCURRENCY (по умолчанию 8),
+        чтобы не упираться в лимиты провайдера.
+        """
+        if not items:
+            return []
+
+        max_concurrency = int(os.getenv("GIGACHAT_CONCURRENCY", "8"))
+        config = {"max_concurrency": max_concurrency}
+
+        # Контракты с извещением и без идут через разные шаблоны промпта,
+        # поэтому группируем их в два пакета, сохраняя исходный порядок
+        groups = {True: [], False: []}  # has_notice -> [(index, invoke_data)]
+        for i, item in enumerate(items):
+            notice_text = item.get('notice_text')
+            invoke_data = self._build_invoke_data(
+                contract_text=item['contract_text'],
+                notice_text=notice_text,
+                law_type=item.get('law_type', "44-ФЗ"),
+                law_context=item.get('law_context')
+            )
+            groups[notice_text is not None].append((i, invoke_data))
+
+        results: List[Dict[str, Any]] = [None] * len(items)
+
+        for has_notice, group in groups.items():
+            if not group:
+                continue
+
+            chain = self._get_chain(has_notice)
+
+            indices = [i for i, _ in group]
+            inputs = [data for _, data in group]
+
+            try:
+                responses = await chain.abatch(inputs, config=config)
+                for i, response in zip(indices, responses):
+                    results[i] = self._parse_response(response)
+            except Exception as e:
+                print(f"GigaChat batch analysis error: {e}")
+                for i in indices:
+                    results[i] = self._api_error_result(e)
+
+        return results
+
+    _BATCH_TEMPLATE = """
+        Ты - эксперт по государственным закупкам {law_type}.
+        Проанализируй КАЖДЫЙ из перечисленных контрактов на соответствие законодательству.
+
+        {law_context}
+
+        {contracts_block}
+
+        ВАЖНО: Ссылайся на конкретные статьи закона при выявлении нарушений!
+        Не выдумывай проблемы! Анализируй только то, что есть в тексте.
+
+        Ответ в формате JSON - массив results, по одному элементу на каждый контракт
+        в том же порядке:
+        {{
+            "results": [
+                {{
+                    "issues": [
+                        {{
+                            "type": "тип_проблемы",
+                            "severity": "critical|warning|info",
+                            "description": "конкретное описание проблемы со ссылкой на статью закона",
+                            "law_reference": "ссылка на статью закона",
+                            "recommendation": "практическая рекомендация по исправлению"
+                        }}
+                    ],
+                    "recommendations": ["общие рекомендации"],
+                    "summary": "объективная оценка с учетом законодательства"
+                }}
+            ]
+        }}
+        """
+
+    def _build_batch_prompt_template(self, contracts: List[str]) -> str:
+        """Собирает промпт с нумерованными блоками контрактов.
+
+        Лимит входа делится поровну между контрактами, чтобы суммарный
+        объем не превышал бюджет одиночного запроса.
+        """
+        per_contract_budget = max(12000 // max(len(contracts), 1), 1000)
+
+        blocks = []
+        for i, text in enumerate(contracts, 1):
+            blocks.append(f"=== КОНТРАКТ {i} ===\n{text[:per_contract_budget]}")
+
+        contracts_block = "\n\n".join(blocks)
+        # Экранируем фигурные скобки из текстов контрактов для ChatPromptTemplate
+        contracts_block = contracts_block.replace("{", "{{").replace("}", "}}")
+
+        return self._BATCH_TEMPLATE.replace("{contracts_block}", contracts_block)
+
+    def _parse_batch_response(self, response: str, expected_count: int) -> List[Dict[str, Any]]:
+        """Парсит пакетный ответ и дополняет его до ожидаемого числа контрактов"""
+        parsed = self._parse_response(response)
+
+        results = parsed.get('results')
+        if not isinstance(results, list):
+            # Модель вернула одиночный ответ - считаем его первым результатом
+            results = [parsed]
+
+        for result in results:
+            for issue in result.get('issues', []):
+                if 'law_reference' not in issue:
+                    issue['law_reference'] = ""
+
+        while len(results) < expected_count:
+            results.append({
+                "issues": [],
+                "recommendations": ["Проведите ручную проверку контракта"],
+                "summary": "Ответ по контракту не получен"
+            })
+
+        return results[:expected_count]
+
+    def analyze_contracts_batch(self, contracts: List[str], law_type: str = "44-ФЗ",
+                                law_context: str = None) -> List[Dict[str, Any]]:
+        """Анализ нескольких контрактов одним запросом к GigaChat.
+
+        Общий префикс промпта (инструкции, контекст закона, схема JSON)
+        оплачивается один раз на весь пакет, а не на каждый контракт.
+        """
+        if not contracts:
+            return []
+
+        from langchain_core.prompts import ChatPromptTemplate
+
+        prompt = ChatPromptTemplate.from_template(self._build_batch_prompt_template(contracts))
         chain = prompt | self.model | self.parser
 
         try:
-            invoke_data = {
+            response = chain.invoke({
                 "law_type": law_type,
                 "law_context": law_context or f"Анализ на соответствие {law_type}",
-                "contract_text": contract_text[:12000],  # Ограничиваем длину
-            }
+            })
+            return self._parse_batch_response(response, len(contracts))
+
+        except Exception as e:
+            print(f"GigaChat batch analysis error: {e}")
+            return [self._api_error_result(e) for _ in contracts]
+
+    async def aanalyze_contracts_batch(self, contracts: List[str], law_type: str = "44-ФЗ",
+                                       law_context: str = None) -> List[Dict[str, Any]]:
+        """Асинхронный пакетный анализ нескольких контрактов одним запросом"""
+        if not contracts:
+            return []
+
+        from langchain_core.prompts import ChatPromptTemplate
 
-            if notice_text:
-                invoke_data["notice_text"] = notice_text[:8000]
+        prompt = ChatPromptTemplate.from_template(self._build_batch_prompt_template(contracts))
+        chain = prompt | self.model | self.parser
 
-            response = chain.invoke(invoke_data)
-            return self._parse_response(response)
+        try:
+            response = await chain.ainvoke({
+                "law_type": law_type,
+                "law_context": law_context or f"Анализ на соответствие {law_type}",
+            })
+            return self._parse_batch_response(response, len(contracts))
 
         except Exception as e:
-            print(f"GigaChat analysis error: {e}")
-            return {
-                "issues": [{
-                    "type": "api_error",
-                    "severity": "warning",
-                    "description": f"Ошибка подключения к AI сервису: {str(e)}",
-                    "law_reference": "",
-                    "recommendation": "Проверьте интернет-соединение и учетные данные GigaChat"
-                }],
-                "recommendations": ["Проведите ручную проверку контракта"],
-                "summary": "AI анализ временно недоступен"
-            }
+            print(f"GigaChat batch analysis error: {e}")
+            return [self._api_error_result(e) for _ in contracts]
 
-    def ask_question(self, question: str, context: Dict = None) -> str:
-        """Задает вопрос о контракте"""
-        prompt = ChatPromptTemplate.from_template("""
+    _QUESTION_TEMPLATE = """
         Ответь на вопрос о контракте на основе контекста.
 
         Контекст: {context}
         Вопрос: {question}
 
         Ответ:
-        """)
+        """
 
-        chain = prompt | self.model | self.parser
+    def ask_question(self, question: str, context: Dict = None) -> str:
+        """Задает вопрос о контракте"""
+        return self._chain_question.invoke({
+            "context": _dumps(context or {}),
+            "question": question
+        })
 
-        return chain.invoke({
-            "context": str(context),
+    async def aask_question(self, question: str, context: Dict = None) -> str:
+        """Асинхронно задает вопрос о контракте"""
+        return await self._chain_question.ainvoke({
+            "context": _dumps(context or {}),
             "question": question
         })
 
@@ -132,11 +635,9 @@ class GigaChatClient:
         """Парсит ответ от GigaChat"""
         try:
             # Ищем JSON в ответе
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end != 0:
-                json_str = response[start:end]
-                parsed = json.loads(json_str)
+            json_str = _extract_json_object(response)
+            if json_str:
+                parsed = _loads(json_str)
 
                 # Добавляем поле law_reference если его нет
                 for issue in parsed.get('issues', []):
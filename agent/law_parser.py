@@ -1,9 +1,164 @@
 import os
+import hashlib
+import pickle
+import sys
 import PyPDF2
 import re
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+try:
+    import pypdfium2 as pdfium  # C-бэкенд PDFium - извлекает текст в разы быстрее PyPDF2
+except ImportError:
+    pdfium = None
+
+try:
+    import ahocorasick  # pyahocorasick: поиск всех ключевых слов одним проходом
+except ImportError:
+    ahocorasick = None
+
+# Все регулярные выражения компилируются один раз при импорте модуля,
+# а не на каждый документ / статью внутри циклов парсинга
+
+# Название статьи - короткий фрагмент до первой точки в начале тела
+_TITLE_RE = re.compile(r'[\s.]*([^.]{5,80})\.')
+
+# Служебные блоки, удаляемые из контента статьи. Альтернативы объединены
+# в один паттерн: одна проходка по тексту вместо восьми
+_CLEANUP_COMBINED = re.compile("|".join(f"(?:{p})" for p in (
+    r'Федеральный закон.*?№\s*\d+[^-]*-ФЗ',
+    r'\d+\s*страниц?а?\s*\d*',
+    r'Раздел\s+[IVXLCDM]+.*',
+    r'Глава\s+\d+.*',
+    r'\([^)]*\)\s*\([^)]*\)',  # Двойные скобки
+    r'\d+\s*-\s*ФЗ',
+    r'Принят.*Государственной Думой',
+    r'Одобрен.*Советом Федерации',
+)), re.IGNORECASE)
+
+_ARTICLE_NUM_RE = re.compile(r'^\d+(?:[.,]\d+)?$')
+_ARTICLE_SPLIT_RE = re.compile(r'(Статья\s+\d+(?:[.,]\d+)?)')
+_ARTICLE_HEADER_RE = re.compile(r'Статья\s+(\d+(?:[.,]\d+)?)')
+_NEXT_ARTICLE_RE = re.compile(r'Статья\s+\d')
+
+# Оглавление и служебные блоки, по которым статья бракуется: одна
+# альтернация проверяет все фразы за один проход по контенту
+_EXCLUDED_RE = re.compile("|".join(map(re.escape, (
+    'оглавление', 'содержание', 'приложение', 'глава',
+    'раздел', 'статья статья', 'часть первая', 'часть вторая'
+))))
+
+_NUM_RE = re.compile(r'\b\d{4,7}\b')
+
+# Таблица для токенизации: все символы, кроме строчной кириллицы,
+# заменяются пробелом - split затем отдает готовые слова без запуска
+# regex-движка на каждый текст. Диапазон до U+2C00 покрывает и
+# типографику правовых текстов (тире U+2014, многоточие U+2026,
+# кавычки-лапки, знак номера U+2116), иначе она склеивала бы
+# соседние слова
+_TOKEN_TABLE = {
+    cp: (cp if 0x430 <= cp <= 0x44F or cp == 0x451 else 0x20)  # а-я, ё
+    for cp in range(0x2C00)
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    """Выделяет значимые кириллические слова (от 4 букв) из текста"""
+    return [word for word in text.translate(_TOKEN_TABLE).split()
+            if len(word) >= 4 and 'ё' not in word]
+
+# Минимальный размер PDF, при котором страницы извлекаются в несколько
+# процессов - на мелких файлах накладные расходы на spawn не окупаются
+_PARALLEL_PAGE_THRESHOLD = 50
+
+# Система весов для разных тем - общая для всех вызовов, поэтому
+# строится один раз на уровне модуля, а не внутри метода
+_TOPIC_WEIGHTS = {
+    "price": {
+        "keywords": frozenset(["цена", "стоимость", "рубл", "сумма", "бюджет", "оплат", "финанс"]),
+        "weight": 2.0,
+        "priority_articles": frozenset(["34", "22", "19"])  # Приоритетные статьи для темы
+    },
+    "deadlines": {
+        "keywords": frozenset(["срок", "период", "дата", "время", "исполнен", "поставк", "выполнен"]),
+        "weight": 1.5,
+        "priority_articles": frozenset(["34", "35", "36"])
+    },
+    "responsibility": {
+        "keywords": frozenset(["ответственность", "штраф", "пеня", "неустойка", "нарушен", "санкц"]),
+        "weight": 1.8,
+        "priority_articles": frozenset(["34", "37"])
+    },
+    "requirements": {
+        "keywords": frozenset(["требован", "услов", "правил", "норм", "стандарт", "качеств", "гарант"]),
+        "weight": 1.3,
+        "priority_articles": frozenset(["33", "34", "32"])
+    },
+    "changes": {
+        "keywords": frozenset(["изменен", "расторжен", "прекращен", "пересмотр", "корректировк"]),
+        "weight": 1.2,
+        "priority_articles": frozenset(["95", "34", "36"])
+    }
+}
+
+_ALL_TOPIC_KEYWORDS = frozenset(
+    kw for data in _TOPIC_WEIGHTS.values() for kw in data["keywords"])
+
+# Автомат Ахо-Корасик находит все ключевые слова за один линейный проход
+# по тексту вместо отдельного поиска подстроки на каждое слово
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _kw in _ALL_TOPIC_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_kw, _kw)
+    _KEYWORD_AUTOMATON.make_automaton()
+else:
+    _KEYWORD_AUTOMATON = None
+
+
+def _matched_keywords(text: str) -> set:
+    """Возвращает множество тематических ключевых слов, найденных в тексте"""
+    if _KEYWORD_AUTOMATON is not None:
+        return {kw for _, kw in _KEYWORD_AUTOMATON.iter(text)}
+    # Локальная привязка __contains__ убирает поиск атрибута на каждое
+    # ключевое слово в горячем цикле
+    contains = text.__contains__
+    return {kw for kw in _ALL_TOPIC_KEYWORDS if contains(kw)}
+
+
+def _extract_pages_range(file_path: str, start: int, end: int) -> List[str]:
+    """Извлекает нормализованный текст страниц [start, end).
+
+    Функция модульного уровня - выполняется в рабочем процессе
+    ProcessPoolExecutor, каждый процесс открывает документ сам.
+    """
+    if pdfium is not None:
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                parts = []
+                for idx in range(start, end):
+                    page = pdf[idx]
+                    textpage = page.get_textpage()
+                    parts.append(" ".join(textpage.get_text_range().split()))
+                    textpage.close()
+                    page.close()
+                return parts
+            finally:
+                pdf.close()
+        except Exception:
+            pass
+
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        parts = []
+        for idx in range(start, end):
+            try:
+                parts.append(" ".join(reader.pages[idx].extract_text().split()))
+            except Exception:
+                continue
+        return parts
+
 
 @dataclass
 class LawArticle:
@@ -12,12 +167,38 @@ class LawArticle:
     content: str
     law_type: str
 
+    # Производные поля: считаются один раз при создании статьи, чтобы
+    # поиск и скоринг не пересобирали их на каждый запрос
+    text_lower: str = ""
+    words: frozenset = frozenset()
+    numbers: frozenset = frozenset()
+
+    def __post_init__(self):
+        # Номера статей и тип закона повторяются во множестве мест
+        # (ключи словарей, приоритетные списки) - интернирование дает
+        # сравнение по указателю вместо посимвольного
+        self.number = sys.intern(self.number)
+        self.law_type = sys.intern(self.law_type)
+        if not self.text_lower:
+            self.text_lower = f"{self.title} {self.content}".lower()
+        if not self.words:
+            self.words = frozenset(_tokenize(self.text_lower))
+        if not self.numbers:
+            self.numbers = frozenset(_NUM_RE.findall(self.text_lower))
+
 
 class LawParser:
     def __init__(self, laws_folder: str = "laws"):
         self.laws_folder = laws_folder
         self._loaded_laws = {}
 
+        # Обратный индекс для поиска: токен -> номера статей с этим словом
+        self._search_indexes = {}
+
+        # LRU-кэш подбора релевантных статей: повторный анализ того же
+        # контракта (ключ - хэш текста) не гоняет скоринг заново
+        self._relevance_cache = OrderedDict()
+
     def load_law(self, law_type: str) -> Dict[str, LawArticle]:
         """Загружает закон из PDF файла и парсит его на статьи"""
         if law_type in self._loaded_laws:
@@ -33,103 +214,202 @@ class LawParser:
         if not os.path.exists(law_file):
             return {}
 
-        articles = self._parse_pdf_law(law_file, law_type)
+        # Сначала пробуем дисковый кэш - парсить PDF закона достаточно
+        # один раз, дальнейшие запуски процесса читают готовый pickle
+        articles = self._load_articles_cache(law_file)
+        if articles is None:
+            articles = self._parse_pdf_law(law_file, law_type)
+            self._save_articles_cache(law_file, articles)
+
         self._loaded_laws[law_type] = articles
         return articles
 
+    # Версия формата кэша: unpickle не вызывает __post_init__, поэтому
+    # кэш со старым набором полей LawArticle (или старой токенизацией
+    # поля words) перечитывать нельзя
+    _ARTICLES_CACHE_VERSION = 4
+
+    def _load_articles_cache(self, law_file: str) -> Optional[Dict[str, LawArticle]]:
+        """Читает кэш разобранных статей, если он свежее самого PDF"""
+        cache_path = law_file + ".cache.pkl"
+        try:
+            if (os.path.exists(cache_path) and
+                    os.path.getmtime(cache_path) >= os.path.getmtime(law_file)):
+                with open(cache_path, 'rb') as f:
+                    payload = pickle.load(f)
+                if (isinstance(payload, tuple) and
+                        payload[0] == self._ARTICLES_CACHE_VERSION):
+                    return payload[1]
+        except Exception:
+            pass
+        return None
+
+    def _save_articles_cache(self, law_file: str, articles: Dict[str, LawArticle]):
+        """Сохраняет разобранные статьи рядом с PDF"""
+        if not articles:
+            return
+        cache_path = law_file + ".cache.pkl"
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump((self._ARTICLES_CACHE_VERSION, articles), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            pass
+
     def _parse_pdf_law(self, file_path: str, law_type: str) -> Dict[str, LawArticle]:
         """УЛУЧШЕННЫЙ парсинг PDF файла закона"""
-        articles = {}
-
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                full_text = ""
-
-                for page in reader.pages:
-                    try:
-                        page_text = page.extract_text()
-                        # Нормализуем текст - критически важно для парсинга
-                        page_text = re.sub(r'\s+', ' ', page_text)
-                        full_text += page_text + " "
-                    except Exception:
-                        continue
-
-                # УЛУЧШЕННЫЕ паттерны для извлечения статей
-                patterns = [
-                    # Основной паттерн для статей с названиями и содержанием
-                    r"Статья\s+(\d+(?:[.,]\d+)?)[\s.]*([^.]{5,80}?)[\s.]*([^С]{2,1500}?)(?=Статья\s+\d+|$)",
-                    # Паттерн для статей без названий
-                    r"Статья\s+(\d+(?:[.,]\d+)?)\.\s*([^С]{2,1500}?)(?=Статья\s+\d+|$)",
-                    # Паттерн для статей с римскими цифрами и сложной структурой
-                    r"Ст\.\s*(\d+(?:[.,]\d+)?)[\s.]*([^С]{2,1500}?)(?=Ст\.\s*\d+|Статья\s+\d+|$)",
-                    # Резервный паттерн для сложных случаев
-                    r"Статья\s+(\d+)[^С]{0,100}?([^.]{5,50})[^С]{0,100}?([^С]{2,1500}?)(?=Статья\s+\d+|$)"
-                ]
-
-                for pattern in patterns:
-                    matches = re.finditer(pattern, full_text, re.IGNORECASE | re.DOTALL)
-
-                    for match in matches:
-                        if len(match.groups()) >= 2:
-                            article_num = match.group(1).strip()
-
-                            # Обрабатываем разные группы захвата
-                            if len(match.groups()) == 3:
-                                article_title = match.group(2).strip() if match.group(2) else "Общие положения"
-                                article_content = match.group(3).strip()
-                            else:
-                                article_title = "Общие положения"
-                                article_content = match.group(2).strip() if match.group(2) else ""
-
-                            # ОЧИСТКА контента от мусора
-                            article_content = self._clean_article_content(article_content)
-
-                            # ВАЛИДАЦИЯ статьи
-                            if (self._is_valid_article(article_num, article_content) and
-                                    article_num not in articles):
-                                articles[article_num] = LawArticle(
-                                    number=article_num,
-                                    title=article_title[:100],
-                                    content=article_content[:2000],  # Увеличил лимит
-                                    law_type=law_type
-                                )
-
-                # Если статей мало - пробуем альтернативный метод
-                if len(articles) < 15:
-                    additional_articles = self._fallback_parsing(full_text, law_type)
-                    articles.update(additional_articles)
-
-                return articles
+            full_text = self._extract_full_text(file_path)
+
+            articles = self._parse_articles_from_text(full_text, law_type)
+
+            # Если статей мало - пробуем альтернативный метод
+            if len(articles) < 15:
+                additional_articles = self._fallback_parsing(full_text, law_type)
+                articles.update(additional_articles)
+
+            return articles
 
         except Exception as e:
             return {}
 
+    def _extract_full_text(self, file_path: str) -> str:
+        """Извлекает нормализованный текст всего PDF.
+
+        При наличии pypdfium2 текст достается C-бэкендом PDFium; PyPDF2
+        остается запасным путем (в т.ч. для PDF, которые PDFium не открыл).
+        Большие законы разбираются параллельно по диапазонам страниц.
+        """
+        n_pages = self._page_count(file_path)
+        if n_pages > _PARALLEL_PAGE_THRESHOLD and (os.cpu_count() or 1) > 1:
+            try:
+                return self._extract_full_text_parallel(file_path, n_pages)
+            except Exception:
+                pass  # Откатываемся на последовательный путь
+
+        if pdfium is not None:
+            try:
+                return self._extract_full_text_pdfium(file_path)
+            except Exception:
+                pass  # Откатываемся на PyPDF2
+
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+
+            # Страницы копятся в списке и склеиваются одним join -
+            # наращивание строки через += квадратично по объему текста
+            parts = []
+            for page in reader.pages:
+                try:
+                    page_text = page.extract_text()
+                    # Нормализуем текст - критически важно для парсинга;
+                    # split/join схлопывает пробелы без regex-движка
+                    parts.append(" ".join(page_text.split()))
+                except Exception:
+                    continue
+
+        return " ".join(parts) + " "
+
+    def _page_count(self, file_path: str) -> int:
+        """Возвращает число страниц PDF (0 при ошибке)"""
+        if pdfium is not None:
+            try:
+                pdf = pdfium.PdfDocument(file_path)
+                try:
+                    return len(pdf)
+                finally:
+                    pdf.close()
+            except Exception:
+                pass
+
+        try:
+            with open(file_path, 'rb') as f:
+                return len(PyPDF2.PdfReader(f).pages)
+        except Exception:
+            return 0
+
+    def _extract_full_text_parallel(self, file_path: str, n_pages: int) -> str:
+        """Извлекает текст PDF, деля страницы между рабочими процессами"""
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        workers = min(os.cpu_count() or 1, 8)
+        chunk = -(-n_pages // workers)  # Округление вверх
+        starts = list(range(0, n_pages, chunk))
+        ends = [min(s + chunk, n_pages) for s in starts]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_extract_pages_range, repeat(file_path), starts, ends)
+            parts = [text for chunk_parts in results for text in chunk_parts]
+
+        return " ".join(parts) + " "
+
+    def _extract_full_text_pdfium(self, file_path: str) -> str:
+        """Извлечение текста закона через pypdfium2"""
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(" ".join(textpage.get_text_range().split()))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+
+        return " ".join(parts) + " "
+
+    def _parse_articles_from_text(self, full_text: str, law_type: str) -> Dict[str, LawArticle]:
+        """Извлекает статьи одним линейным re.split по заголовкам 'Статья N'.
+
+        Прежние finditer-паттерны с негативными классами до 1500 символов
+        и lookahead-ами давали квадратичный бэктрекинг на больших законах;
+        split делит текст за один проход, после чего каждая пара
+        (заголовок, тело) обрабатывается независимо.
+        """
+        articles = {}
+        parts = _ARTICLE_SPLIT_RE.split(full_text)
+
+        # parts[1::2] - заголовки "Статья N", parts[2::2] - тела статей
+        for i in range(1, len(parts) - 1, 2):
+            header_match = _ARTICLE_HEADER_RE.match(parts[i])
+            if not header_match:
+                continue
+
+            article_num = header_match.group(1).strip()
+            body = parts[i + 1][:2000]
+
+            # Название - короткий фрагмент до первой точки, как раньше
+            title_match = _TITLE_RE.match(body)
+            if title_match:
+                article_title = title_match.group(1).strip()
+                article_content = body[title_match.end():]
+            else:
+                article_title = "Общие положения"
+                article_content = body
+
+            # ОЧИСТКА контента от мусора
+            article_content = self._clean_article_content(article_content)
+
+            # ВАЛИДАЦИЯ статьи
+            if (self._is_valid_article(article_num, article_content) and
+                    article_num not in articles):
+                articles[article_num] = LawArticle(
+                    number=article_num,
+                    title=article_title[:100],
+                    content=article_content[:2000],
+                    law_type=law_type
+                )
+
+        return articles
+
     def _clean_article_content(self, content: str) -> str:
         """Очищает контент статьи от мусора"""
         if not content:
             return ""
 
-        # Удаляем служебные блоки
-        cleanup_patterns = [
-            r'Федеральный закон.*?№\s*\d+[^-]*-ФЗ',
-            r'\d+\s*страниц?а?\s*\d*',
-            r'Раздел\s+[IVXLCDM]+.*',
-            r'Глава\s+\d+.*',
-            r'\([^)]*\)\s*\([^)]*\)',  # Двойные скобки
-            r'\d+\s*-\s*ФЗ',
-            r'Принят.*Государственной Думой',
-            r'Одобрен.*Советом Федерации',
-        ]
-
-        cleaned = content
-        for pattern in cleanup_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
-
-        # Нормализуем пробелы
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-
-        return cleaned
+        # Удаляем служебные блоки одним проходом и нормализуем пробелы
+        return " ".join(_CLEANUP_COMBINED.sub('', content).split())
 
     def _is_valid_article(self, article_num: str, content: str) -> bool:
         """Проверяет валидность извлеченной статьи"""
@@ -137,7 +417,7 @@ class LawParser:
             return False
 
         # Проверяем что номер статьи - число
-        if not re.match(r'^\d+(?:[.,]\d+)?$', article_num):
+        if not _ARTICLE_NUM_RE.match(article_num):
             return False
 
         # Проверяем минимальную длину контента
@@ -145,15 +425,8 @@ class LawParser:
             return False
 
         # Исключаем оглавление и служебные блоки
-        excluded_phrases = [
-            'оглавление', 'содержание', 'приложение', 'глава',
-            'раздел', 'статья статья', 'часть первая', 'часть вторая'
-        ]
-
-        content_lower = content.lower()
-        for phrase in excluded_phrases:
-            if phrase in content_lower:
-                return False
+        if _EXCLUDED_RE.search(content.lower()):
+            return False
 
         return True
 
@@ -162,17 +435,17 @@ class LawParser:
         articles = {}
 
         # Разделяем по "Статья X" и берем следующий текст
-        parts = re.split(r'(Статья\s+\d+(?:[.,]\d+)?)', full_text)
+        parts = _ARTICLE_SPLIT_RE.split(full_text)
 
         for i in range(1, len(parts), 2):
             if i + 1 < len(parts):
-                article_match = re.match(r'Статья\s+(\d+(?:[.,]\d+)?)', parts[i])
+                article_match = _ARTICLE_HEADER_RE.match(parts[i])
                 if article_match:
                     article_num = article_match.group(1)
                     article_content = parts[i + 1]
 
                     # Берем текст до следующей статьи или ограничиваем длину
-                    next_article_match = re.search(r'Статья\s+\d', article_content)
+                    next_article_match = _NEXT_ARTICLE_RE.search(article_content)
                     if next_article_match:
                         article_content = article_content[:next_article_match.start()]
 
@@ -193,18 +466,50 @@ class LawParser:
         articles = self.load_law(law_type)
         return articles.get(article_number)
 
+    def _get_search_index(self, law_type: str, articles: Dict[str, LawArticle]) -> Dict[str, set]:
+        """Строит (один раз на закон) обратный индекс: каждая максимальная
+        кириллическая последовательность текста -> номера статей.
+
+        В отличие от article.words сюда попадают все слова без фильтра
+        по длине и букве ё - индекс обязан покрывать любое вхождение.
+        """
+        index = self._search_indexes.get(law_type)
+        if index is None:
+            index = {}
+            for number, article in articles.items():
+                for token in set(article.text_lower.translate(_TOKEN_TABLE).split()):
+                    index.setdefault(token, set()).add(number)
+            self._search_indexes[law_type] = index
+        return index
+
     def search_articles(self, law_type: str, query: str) -> List[LawArticle]:
-        """Ищет статьи по ключевым словам"""
+        """Ищет статьи по подстроке запроса"""
         articles = self.load_law(law_type)
-        matching_articles = []
 
         query_lower = query.lower()
-        for article in articles.values():
-            article_text = f"{article.title} {article.content}".lower()
-            if query_lower in article_text:
-                matching_articles.append(article)
 
-        return matching_articles
+        # Чисто кириллический запрос целиком лежит внутри одной
+        # кириллической последовательности текста, поэтому объединение
+        # статей по всем словам индекса, содержащим запрос, дает тех же
+        # кандидатов, что и полный проход: 'оплат' находит и 'оплата',
+        # 'срок' - 'сроками'
+        if query_lower and all('а' <= ch <= 'я' or ch == 'ё' for ch in query_lower):
+            index = self._get_search_index(law_type, articles)
+            candidates = set()
+            for token, postings in index.items():
+                if query_lower in token:
+                    candidates |= postings
+
+            return [article for number, article in articles.items()
+                    if number in candidates and query_lower in article.text_lower]
+
+        # Запрос с пробелами, цифрами или не-кириллицей -
+        # обычный проход по подстроке
+        return [article for article in articles.values()
+                if query_lower in article.text_lower]
+
+    # Максимум записей в кэше релевантности
+    _RELEVANCE_CACHE_MAX = 32
 
     def get_relevant_articles_for_contract(self, contract_text: str, law_type: str) -> List[LawArticle]:
         """УЛУЧШЕННЫЙ поиск релевантных статей с весовой системой"""
@@ -213,75 +518,58 @@ class LawParser:
         if not articles_dict:
             return []
 
+        cache_key = (law_type, hashlib.blake2b(
+            contract_text.encode('utf-8', 'ignore'), digest_size=16).hexdigest())
+        cached = self._relevance_cache.get(cache_key)
+        if cached is not None:
+            self._relevance_cache.move_to_end(cache_key)
+            return list(cached)
+
         # Нормализуем текст контракта
-        contract_clean = re.sub(r'\s+', ' ', contract_text.lower())
+        contract_clean = " ".join(contract_text.lower().split())
         articles = list(articles_dict.values())
 
-        # Система весов для разных тем
-        topic_weights = {
-            "price": {
-                "keywords": ["цена", "стоимость", "рубл", "сумма", "бюджет", "оплат", "финанс"],
-                "weight": 2.0,
-                "priority_articles": ["34", "22", "19"]  # Приоритетные статьи для темы
-            },
-            "deadlines": {
-                "keywords": ["срок", "период", "дата", "время", "исполнен", "поставк", "выполнен"],
-                "weight": 1.5,
-                "priority_articles": ["34", "35", "36"]
-            },
-            "responsibility": {
-                "keywords": ["ответственность", "штраф", "пеня", "неустойка", "нарушен", "санкц"],
-                "weight": 1.8,
-                "priority_articles": ["34", "37"]
-            },
-            "requirements": {
-                "keywords": ["требован", "услов", "правил", "норм", "стандарт", "качеств", "гарант"],
-                "weight": 1.3,
-                "priority_articles": ["33", "34", "32"]
-            },
-            "changes": {
-                "keywords": ["изменен", "расторжен", "прекращен", "пересмотр", "корректировк"],
-                "weight": 1.2,
-                "priority_articles": ["95", "34", "36"]
-            }
-        }
+        # Все характеристики контракта считаются один раз на весь вызов,
+        # а не заново на каждую статью в цикле
+        contract_keywords = _matched_keywords(contract_clean)
+        contract_words = set(_tokenize(contract_clean))
+        contract_numbers = set(_NUM_RE.findall(contract_clean))
+
+        # Темы, представленные в контракте, известны до входа в цикл;
+        # темы без совпадений в контракте из скоринга выпадают сразу
+        contract_topics = [
+            (data, data["keywords"] & contract_keywords)
+            for data in _TOPIC_WEIGHTS.values()
+            if data["keywords"] & contract_keywords
+        ]
 
         scored_articles = []
 
         for article in articles:
             score = 0
-            article_text = f"{article.title} {article.content}".lower()
+            article_keywords = _matched_keywords(article.text_lower)
 
             # 1. Прямое совпадение ключевых слов
-            for topic, data in topic_weights.items():
-                topic_keywords = data["keywords"]
-                topic_weight = data["weight"]
-
-                # Проверяем есть ли ключевые слова и в контракте и в статье
-                contract_has_topic = any(kw in contract_clean for kw in topic_keywords)
-                article_has_topic = any(kw in article_text for kw in topic_keywords)
+            for data, contract_topic_kws in contract_topics:
+                # Проверяем есть ли ключевые слова темы и в статье
+                article_topic_kws = data["keywords"] & article_keywords
 
-                if contract_has_topic and article_has_topic:
-                    score += topic_weight
+                if article_topic_kws:
+                    score += data["weight"]
 
                     # Дополнительные баллы за множественные совпадения
-                    matches = sum(1 for kw in topic_keywords if kw in contract_clean and kw in article_text)
-                    score += matches * 0.3
+                    score += len(contract_topic_kws & article_topic_kws) * 0.3
 
                     # Дополнительные баллы если статья в списке приоритетных для темы
                     if article.number in data["priority_articles"]:
                         score += 0.8
 
-            # 2. Совпадение числовых значений (для статей с лимитами)
-            number_matches = self._find_numeric_matches(contract_clean, article_text)
-            score += number_matches * 0.5
+            # 2. Совпадение числовых значений (для статей с лимитами):
+            # числа статьи (4-7 цифр - обычно суммы, сроки) уже извлечены
+            score += len(contract_numbers & article.numbers) * 0.5
 
             # 3. Длина совпадающих слов (только значимые слова)
-            contract_words = set(re.findall(r'\b[а-я]{4,}\b', contract_clean))
-            article_words = set(re.findall(r'\b[а-я]{4,}\b', article_text))
-            common_words = contract_words & article_words
-
-            score += len(common_words) * 0.1
+            score += len(contract_words & article.words) * 0.1
 
             if score > 0.3:  # Минимальный порог релевантности
                 scored_articles.append((article, score))
@@ -289,14 +577,10 @@ class LawParser:
         # Сортируем по релевантности
         scored_articles.sort(key=lambda x: x[1], reverse=True)
 
-        return [article for article, score in scored_articles[:10]]  # Топ-10 статей
-
-    def _find_numeric_matches(self, contract_text: str, article_text: str) -> int:
-        """Находит совпадения числовых значений (лимиты, сроки и т.д.)"""
-        # Ищем числа в статье (4-7 цифр - обычно суммы, сроки)
-        article_numbers = set(re.findall(r'\b\d{4,7}\b', article_text))
+        result = [article for article, score in scored_articles[:10]]  # Топ-10 статей
 
-        # Ищем те же числа в контракте
-        contract_numbers = set(re.findall(r'\b\d{4,7}\b', contract_text))
+        self._relevance_cache[cache_key] = tuple(result)
+        if len(self._relevance_cache) > self._RELEVANCE_CACHE_MAX:
+            self._relevance_cache.popitem(last=False)
 
-        return len(contract_numbers & article_numbers)
\ No newline at end of file
+        return result
@@ -1,25 +1,129 @@
+import io
+import os
 import PyPDF2
 from docx import Document
 import re
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 
+try:
+    import pypdfium2 as pdfium  # C-бэкенд PDFium - извлекает текст в разы быстрее PyPDF2
+except ImportError:
+    pdfium = None
+
+try:
+    from charset_normalizer import from_bytes as _charset_from_bytes  # Автоопределение кодировки
+except ImportError:
+    _charset_from_bytes = None
+
+try:
+    import ahocorasick  # pyahocorasick: поиск всех ключевых фраз одним проходом
+except ImportError:
+    ahocorasick = None
+
+# Единый ценовой паттерн: три прежних альтернативы объединены в одну
+# альтернацию - один проход по документу вместо трех, именованные
+# группы захватывают саму сумму
+_PRICE_RE = re.compile(
+    r'(?:цена\s+контракта\s+составляет\s+[^\n]{0,200}?(?P<direct>\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?))|'
+    r'(?:стоимость[^\n]{0,100}?(?P<cost>\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?))|'
+    r'(?:(?P<rub>\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?)\s*рубл)',
+    re.IGNORECASE | re.DOTALL)
+
+# Упоминания статьи 93 / пункта 25 44-ФЗ - тоже компилируется один раз
+_ARTICLE_93_RE = re.compile(r'ст\.\s*93|стать[ия]\s*93|п\.\s*25|пункт\s*25', re.IGNORECASE)
+
+# Маркеры, без которых ни один ценовой паттерн не совпадет; search
+# останавливается на первом вхождении и не требует строчной копии текста
+_PRICE_MARKER_RE = re.compile(r'цена|стоимость|рубл', re.IGNORECASE)
+
+# Очистка суммы: один C-проход translate удаляет разделители разрядов.
+# Кроме цифр и [.,] группы _PRICE_RE пропускают только \s, поэтому
+# таблица перечисляет все пробельные символы Юникода - включая узкий
+# неразрывный пробел U+202F, которым Word разделяет разряды в русских
+# документах; U+3000 - последний пробельный код-пойнт
+_PRICE_CLEAN_TABLE = {cp: None for cp in range(0x3001) if chr(cp).isspace()}
+
 
 class FileProcessor:
     """Обработка файлов контрактов"""
 
+    # Максимум записей в кэше извлеченного текста
+    _TEXT_CACHE_MAX = 64
+
+    def __init__(self):
+        # Кэш извлеченного текста по отпечатку (путь, mtime, размер):
+        # повторное обращение к тому же файлу - из веб-роута, анализатора
+        # или обоих сразу - не парсит PDF/DOCX заново
+        self._text_cache = OrderedDict()
+
+        # Диспетчеризация по расширению: один lookup в словаре вместо
+        # цепочки endswith-проверок
+        self._extractors = {
+            '.pdf': self._extract_from_pdf,
+            '.docx': self._extract_from_docx,
+            '.txt': self._extract_from_txt,
+        }
+
+    def extract_text_bytes(self, data: bytes, mime_hint: str = '') -> str:
+        """Извлекает текст из уже загруженных байтов без обращения к диску.
+
+        mime_hint - имя файла, расширение или MIME-тип
+        ('contract.pdf', 'docx', 'application/pdf' и т.п.).
+        """
+        try:
+            hint = mime_hint.lower()
+
+            # Формат определяем по суффиксу/MIME-типу, а не по вхождению
+            # подстроки в имя файла: 'pdf_отчет.docx' - это DOCX
+            if hint.endswith('.docx') or hint == 'docx' or 'wordprocessingml' in hint:
+                return self._extract_docx_source(io.BytesIO(data))
+            elif hint.endswith('.pdf') or hint == 'pdf' or hint.endswith('/pdf'):
+                # pypdfium2 принимает и байты - быстрый бэкенд работает
+                # и для загрузок, не попадающих на диск
+                if pdfium is not None:
+                    try:
+                        return self._extract_pdf_pdfium(data)
+                    except Exception:
+                        pass
+                return self._extract_pdf_stream(io.BytesIO(data))
+            else:
+                return self._decode_txt_bytes(data)
+        except Exception as e:
+            print(f"Error extracting text from bytes: {e}")
+            return f"Ошибка чтения файла: {str(e)}"
+
     def extract_text(self, file_path: str) -> str:
+        """Извлекает текст из файла с кэшированием по отпечатку файла"""
+        # mtime и размер входят в ключ, чтобы измененный файл
+        # извлекался заново
+        try:
+            st = os.stat(file_path)
+            key = (file_path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+
+        if key is not None:
+            cached = self._text_cache.get(key)
+            if cached is not None:
+                self._text_cache.move_to_end(key)
+                return cached
+
+        text = self._extract_text_uncached(file_path)
+
+        if key is not None:
+            self._text_cache[key] = text
+            if len(self._text_cache) > self._TEXT_CACHE_MAX:
+                self._text_cache.popitem(last=False)
+
+        return text
+
+    def _extract_text_uncached(self, file_path: str) -> str:
         """Извлекает текст из файла с поддержкой разных регистров расширений"""
         try:
-            file_path_lower = file_path.lower()
-
-            if file_path_lower.endswith('.pdf'):
-                return self._extract_from_pdf(file_path)
-            elif file_path_lower.endswith('.docx'):
-                return self._extract_from_docx(file_path)
-            elif file_path_lower.endswith('.txt'):
-                return self._extract_from_txt(file_path)
-            else:
-                return self._extract_with_fallback(file_path)
+            ext = os.path.splitext(file_path)[1].lower()
+            extractor = self._extractors.get(ext, self._extract_with_fallback)
+            return extractor(file_path)
         except Exception as e:
             print(f"Error extracting text from {file_path}: {e}")
             return f"Ошибка чтения файла: {str(e)}"
@@ -27,44 +131,114 @@ class FileProcessor:
     def _extract_from_pdf(self, file_path: str) -> str:
         """Извлекает текст из PDF файла"""
         try:
+            if pdfium is not None:
+                try:
+                    return self._extract_pdf_pdfium(file_path)
+                except Exception:
+                    pass  # Зашифрованные и нестандартные PDF уходят в PyPDF2
+
             with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
+                return self._extract_pdf_stream(file)
 
-                if reader.is_encrypted:
-                    try:
-                        reader.decrypt('')
-                    except:
-                        return "PDF файл защищен паролем"
+        except Exception as e:
+            raise Exception(f"Ошибка чтения PDF: {str(e)}")
 
-                text = ""
-                for page in reader.pages:
+    def _extract_pdf_pdfium(self, source) -> str:
+        """Быстрое извлечение текста через pypdfium2 (путь или байты)"""
+        pdf = pdfium.PdfDocument(source)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+
+        text = "\n".join(parts)
+        return text if text.strip() else "Не удалось извлечь текст из PDF"
+
+    # Минимум страниц, при котором PyPDF2-извлечение распараллеливается
+    # по потокам - на коротких документах пул не окупается
+    _PDF_THREAD_THRESHOLD = 8
+
+    def _extract_pdf_stream(self, stream) -> str:
+        """Извлекает текст PDF из открытого файла или буфера в памяти"""
+        data = stream.read()
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+        if reader.is_encrypted:
+            try:
+                reader.decrypt('')
+            except:
+                return "PDF файл защищен паролем"
+
+        def extract(page):
+            try:
+                return page.extract_text() or ""
+            except:
+                return ""
+
+        n_pages = len(reader.pages)
+        if n_pages >= self._PDF_THREAD_THRESHOLD:
+            # PdfReader не потокобезопасен: ленивое разрешение объектов
+            # делает seek/read по общему потоку, и общий reader из
+            # нескольких потоков отдает перемешанный текст. Поэтому
+            # каждый поток парсит свой reader над собственным BytesIO
+            # и извлекает свой диапазон страниц; map сохраняет порядок
+            def extract_range(bounds):
+                start, stop = bounds
+                local = PyPDF2.PdfReader(io.BytesIO(data))
+                if local.is_encrypted:
                     try:
-                        text += page.extract_text() + "\n"
+                        local.decrypt('')
                     except:
-                        continue
+                        return [""] * (stop - start)
+                local_pages = local.pages
+                return [extract(local_pages[i]) for i in range(start, stop)]
+
+            from concurrent.futures import ThreadPoolExecutor
+            workers = 4
+            step = -(-n_pages // workers)  # потолок деления
+            ranges = [(start, min(start + step, n_pages))
+                      for start in range(0, n_pages, step)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parts = [part for chunk in executor.map(extract_range, ranges)
+                         for part in chunk]
+        else:
+            parts = [extract(page) for page in reader.pages]
 
-                return text if text.strip() else "Не удалось извлечь текст из PDF"
-
-        except Exception as e:
-            raise Exception(f"Ошибка чтения PDF: {str(e)}")
+        # Склейка одним join вместо квадратичного наращивания через +=
+        text = "\n".join(part for part in parts if part)
+        return text if text.strip() else "Не удалось извлечь текст из PDF"
 
     def _extract_from_docx(self, file_path: str) -> str:
         """Извлекает текст из DOCX файла с улучшенной обработкой"""
+        return self._extract_docx_source(file_path)
+
+    def _extract_docx_source(self, source) -> str:
+        """Извлекает текст DOCX из пути к файлу или буфера в памяти"""
         try:
-            doc = Document(file_path)
+            doc = Document(source)
             full_text = []
+            append = full_text.append  # Без поиска атрибута в горячем цикле
 
-            # Извлекаем текст из параграфов
+            # Извлекаем текст из параграфов; .text у python-docx - обход
+            # XML-узлов, поэтому вычисляется один раз на параграф
             for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    full_text.append(paragraph.text)
+                text = paragraph.text
+                # isspace не аллоцирует новую строку в отличие от strip
+                if text and not text.isspace():
+                    append(text)
 
             # Извлекаем текст из таблиц
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        if cell.text.strip():
-                            full_text.append(cell.text)
+                        text = cell.text
+                        if text and not text.isspace():
+                            append(text)
 
             return "\n".join(full_text)
         except Exception as e:
@@ -73,17 +247,38 @@ class FileProcessor:
     def _extract_from_txt(self, file_path: str) -> str:
         """Извлекает текст из TXT файла"""
         try:
-            encodings = ['utf-8', 'cp1251', 'windows-1251', 'iso-8859-1']
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as file:
-                        return file.read()
-                except UnicodeDecodeError:
-                    continue
-            raise Exception("Не удалось декодировать файл")
+            # Файл читается с диска один раз, перебор кодировок идет
+            # по байтам в памяти, а не повторным открытием файла
+            with open(file_path, 'rb') as file:
+                return self._decode_txt_bytes(file.read())
         except Exception as e:
             raise Exception(f"Ошибка чтения TXT: {str(e)}")
 
+    def _decode_txt_bytes(self, data: bytes) -> str:
+        """Декодирует текстовые байты: сперва UTF-8, дальше автоопределение"""
+        # Быстрый C-путь для ASCII/UTF-8 - подавляющее большинство файлов
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+
+        # Автоопределение кодировки одним проходом, если библиотека есть -
+        # надежнее слепого перебора (cp1251 "успешно" декодирует почти
+        # любые байты)
+        if _charset_from_bytes is not None:
+            best = _charset_from_bytes(data).best()
+            if best is not None:
+                return str(best)
+
+        # Без charset_normalizer - прежний перебор кодировок
+        for encoding in ('cp1251', 'windows-1251', 'iso-8859-1'):
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+
+        raise Exception("Не удалось декодировать файл")
+
     def _extract_with_fallback(self, file_path: str) -> str:
         """Резервный метод извлечения текста"""
         try:
@@ -104,17 +299,44 @@ class ContractValidator:
             "ответственность сторон": ["ответственность сторон", "ответственность", "штраф", "пеня", "неустойка"],
         }
 
+        # Автомат Ахо-Корасик находит маркеры всех разделов за один
+        # линейный проход по контракту вместо поиска каждой фразы отдельно
+        if ahocorasick is not None:
+            self._clauses_automaton = ahocorasick.Automaton()
+            for clause_name, patterns in self.mandatory_clauses_44.items():
+                for pattern in patterns:
+                    self._clauses_automaton.add_word(pattern, clause_name)
+            self._clauses_automaton.make_automaton()
+            self._clause_regex = None
+            self._clause_names = None
+        else:
+            # Запасной путь без pyahocorasick: альтернация с именованными
+            # группами находит маркеры всех разделов за один finditer
+            # вместо отдельного поиска каждой фразы
+            self._clauses_automaton = None
+            self._clause_names = list(self.mandatory_clauses_44)
+            self._clause_regex = re.compile("|".join(
+                f"(?P<c{i}>{'|'.join(map(re.escape, patterns))})"
+                for i, patterns in enumerate(self.mandatory_clauses_44.values())),
+                re.IGNORECASE)
+
     def basic_validation(self, contract_text: str, law_type: str) -> Dict[str, Any]:
         """Улучшенная проверка обязательных условий"""
         errors = []
         warnings = []
 
-        text_lower = contract_text.lower()
+        # Проверяем наличие обязательных разделов. Строчная копия текста
+        # (лишний полный memcpy документа) нужна только автомату -
+        # IGNORECASE-альтернация идет по исходной строке
+        if self._clauses_automaton is not None:
+            found_clauses = {name for _, name in
+                             self._clauses_automaton.iter(contract_text.lower())}
+        else:
+            found_clauses = {self._clause_names[int(m.lastgroup[1:])]
+                             for m in self._clause_regex.finditer(contract_text)}
 
-        # Проверяем наличие обязательных разделов
-        for clause_name, patterns in self.mandatory_clauses_44.items():
-            found = any(pattern in text_lower for pattern in patterns)
-            if not found:
+        for clause_name in self.mandatory_clauses_44:
+            if clause_name not in found_clauses:
                 errors.append({
                     'type': 'missing_clause',
                     'clause': clause_name,
@@ -144,48 +366,40 @@ class ContractValidator:
 
     def _extract_price_info(self, text: str) -> Dict[str, Any]:
         """ТОЧНО извлекает информацию о цене контракта"""
-        # Паттерны для поиска цены
-        price_patterns = [
-            r'цена\s+контракта\s+составляет\s+([^\n]{0,200}?)(\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?)',
-            r'стоимость[^\n]{0,100}?(\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?)',
-            r'(\d{1,3}(?:\s?\d{3})*(?:[.,]\d{2})?)\s*рубл',
-        ]
-
-        for pattern in price_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                price_str = match.group(1) if len(match.groups()) > 1 else match.group(1)
-                # Очищаем строку от пробелов и преобразуем в число
-                price_clean = re.sub(r'[^\d,.]', '', price_str.replace(' ', ''))
-                price_clean = price_clean.replace(',', '.')
-
-                try:
-                    numeric_value = float(price_clean)
-                    return {
-                        'found': True,
-                        'text_value': price_str.strip(),
-                        'numeric_value': numeric_value,
-                        'context': match.group(0)[:100]
-                    }
-                except ValueError:
-                    continue
+        # Быстрый фильтр: каждый паттерн требует один из этих маркеров,
+        # без них гонять ценовые паттерны по всему тексту незачем
+        if _PRICE_MARKER_RE.search(text) is None:
+            return {'found': False}
+
+        for match in _PRICE_RE.finditer(text):
+            price_str = (match.group('direct') or match.group('cost') or
+                         match.group('rub'))
+            # Очищаем строку от пробелов и преобразуем в число
+            price_clean = price_str.translate(_PRICE_CLEAN_TABLE).replace(',', '.')
+
+            try:
+                numeric_value = float(price_clean)
+                return {
+                    'found': True,
+                    'text_value': price_str.strip(),
+                    'numeric_value': numeric_value,
+                    'context': match.group(0)[:100]
+                }
+            except ValueError:
+                continue
 
         return {'found': False}
 
     def _check_contract_foundation(self, text: str, price: float, law_type: str) -> Optional[Dict]:
         """Проверяет соответствие основания заключения контракта его цене"""
-        # Ищем упоминания статей 44-ФЗ
-        article_93_pattern = r'ст\.\s*93|стать[ия]\s*93|п\.\s*25|пункт\s*25'
-        article_93_matches = re.findall(article_93_pattern, text, re.IGNORECASE)
-
-        if article_93_matches and price > 100000:
+        # Ищем упоминание статьи 93: search останавливается на первом
+        # совпадении, список всех вхождений здесь не нужен
+        if _ARTICLE_93_RE.search(text) and price > 100000:
             return {
                 'type': 'foundation_mismatch',
                 'severity': 'critical',
                 'message': f'Цена контракта ({price} руб.) превышает лимит для п. 25 ч. 1 ст. 93 44-ФЗ (100 000 руб.)'
             }
-        elif article_93_matches and price <= 100000:
-            return None  # Все корректно
 
         return None
 
@@ -1,10 +1,19 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 import os
+import secrets
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
 import json
 from datetime import datetime
 import logging
 
+try:
+    import orjson  # C-сериализация больших JSON-ответов анализа
+except ImportError:
+    orjson = None
+
 # Настройка логирования
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -14,18 +23,52 @@ app.secret_key = 'dev-secret-key-change-in-production-12345'
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
+# Папка загрузок создается один раз при импорте (работает и под gunicorn,
+# где блок __main__ не выполняется) - роуты не делают makedirs на каждый POST
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
 # Устанавливаем переменные окружения напрямую
 os.environ['GIGACHAT_CREDENTIALS'] = ''  # Замените на реальные учетные данные
 
 # Поддерживаемые форматы файлов
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_EXTENSIONS)
+
+# Анализ выполняется в фоновом пуле: HTTP-поток не занят на все время
+# извлечения текста и запроса к GigaChat, клиент опрашивает статус задачи.
+# Запись: job_id -> (future, время постановки)
+EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+JOBS = {}
+
+# Завершенные задачи старше этого срока считаются брошенными (клиент
+# закрыл страницу и перестал опрашивать статус) и удаляются при
+# постановке новых - иначе их Future с полным результатом живут вечно
+JOB_TTL_SECONDS = 15 * 60
+
+
+def _purge_stale_jobs():
+    """Удаляет завершенные задачи, которые никто давно не забирает"""
+    deadline = time.monotonic() - JOB_TTL_SECONDS
+    stale = [job_id for job_id, (future, submitted_at) in JOBS.items()
+             if future.done() and submitted_at < deadline]
+    for job_id in stale:
+        JOBS.pop(job_id, None)
 
 
 def allowed_file(filename):
-    if '.' not in filename:
-        return False
-    ext = filename.rsplit('.', 1)[1].lower()
-    return ext in ALLOWED_EXTENSIONS
+    # endswith с кортежем суффиксов проверяет все расширения на C-уровне
+    # без промежуточного списка от rsplit
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+
+def save_upload(file_storage, path):
+    """Сохраняет загруженный файл на диск блоками по 1 МБ.
+
+    FileStorage.save пишет блоками по 16 КБ - на больших загрузках это
+    лишние тысячи syscall'ов.
+    """
+    with open(path, 'wb') as dst:
+        shutil.copyfileobj(file_storage.stream, dst, length=1024 * 1024)
 
 
 # Инициализация ИИ-агента с обработкой ошибок
@@ -33,12 +76,16 @@ try:
     from agent.contract_analyzer import ContractAnalyzer
 
     analyzer = ContractAnalyzer()
+    # Один клиент GigaChat на процесс: повторные запросы /api/chat
+    # переиспользуют HTTP-сессию и кэш, а не строят клиента заново
+    giga_client = analyzer.giga_client
     AI_AVAILABLE = True
     print("✓ AI Agent initialized successfully")
 except Exception as e:
     print(f"✗ AI Agent initialization failed: {e}")
     AI_AVAILABLE = False
     analyzer = None
+    giga_client = None
 
 
 @app.route('/')
@@ -64,18 +111,15 @@ def upload_files():
             # Сохраняем контракт
             contract_filename = secure_filename(contract_file.filename)
 
-            # Создаем папку если не существует
-            os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
             contract_path = os.path.join(app.config['UPLOAD_FOLDER'], contract_filename)
-            contract_file.save(contract_path)
+            save_upload(contract_file, contract_path)
 
             # Сохраняем извещение если оно загружено
             notice_path = None
             if notice_file and notice_file.filename != '' and allowed_file(notice_file.filename):
                 notice_filename = secure_filename(notice_file.filename)
                 notice_path = os.path.join(app.config['UPLOAD_FOLDER'], notice_filename)
-                notice_file.save(notice_path)
+                save_upload(notice_file, notice_path)
 
             # Сохраняем в сессию
             session['contract_path'] = contract_path
@@ -94,6 +138,27 @@ def analyze():
     return render_template('analysis.html')
 
 
+def _run_analysis(contract_path, notice_path, law_type):
+    """Тяжелая часть анализа - выполняется в фоновом пуле"""
+    # Извлекаем тексты один раз и передаем их в анализатор готовыми -
+    # повторного парсинга PDF/DOCX внутри analyze_contract не происходит
+    contract_text = analyzer.file_processor.extract_text(contract_path)
+    logger.info(f"Contract text length: {len(contract_text)}")
+    logger.info(f"First 500 chars: {contract_text[:500]}")
+
+    notice_text = None
+    if notice_path:
+        notice_text = analyzer.file_processor.extract_text(notice_path)
+        logger.info(f"Notice text length: {len(notice_text)}")
+
+    # Анализ контракта
+    return analyzer.analyze_contract(
+        contract_text=contract_text,
+        notice_text=notice_text,
+        law_type=law_type
+    )
+
+
 @app.route('/api/analyze', methods=['POST'])
 def api_analyze():
     try:
@@ -125,32 +190,49 @@ def api_analyze():
         if notice_path and not os.path.exists(notice_path):
             return jsonify({'error': f'Извещение не найдено: {notice_path}'}), 400
 
-        # Логируем информацию о файлах
-        contract_text = analyzer.file_processor.extract_text(contract_path)
-        logger.info(f"Contract text length: {len(contract_text)}")
-        logger.info(f"First 500 chars: {contract_text[:500]}")
+        # Ставим задачу в фоновый пул и сразу отвечаем клиенту
+        _purge_stale_jobs()
+        job_id = secrets.token_hex(8)
+        JOBS[job_id] = (EXECUTOR.submit(_run_analysis, contract_path, notice_path, law_type),
+                        time.monotonic())
 
-        if notice_path:
-            notice_text = analyzer.file_processor.extract_text(notice_path)
-            logger.info(f"Notice text length: {len(notice_text)}")
+        logger.info(f"Analysis job {job_id} submitted")
+        return jsonify({'job_id': job_id}), 202
+
+    except Exception as e:
+        logger.error(f"Analysis error: {str(e)}", exc_info=True)
+        return jsonify({'error': f'Ошибка анализа: {str(e)}'}), 500
 
-        # Анализ контракта
-        result = analyzer.analyze_contract(
-            contract_path=contract_path,
-            notice_path=notice_path,
-            law_type=law_type
-        )
 
-        # Сохраняем результат в сессию
-        session['analysis_result'] = result
+@app.route('/api/analyze/<job_id>')
+def api_analyze_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Задача анализа не найдена'}), 404
 
-        logger.info("Analysis completed successfully")
-        return jsonify(result)
+    future, _ = job
+    if not future.done():
+        return jsonify({'status': 'processing'})
 
+    JOBS.pop(job_id, None)
+    try:
+        result = future.result()
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}", exc_info=True)
         return jsonify({'error': f'Ошибка анализа: {str(e)}'}), 500
 
+    # Сохраняем результат в сессию (доступен request context)
+    session['analysis_result'] = result
+
+    logger.info("Analysis completed successfully")
+
+    # Результат анализа - самый крупный ответ приложения; orjson
+    # сериализует его в разы быстрее стандартного json
+    payload = {'status': 'done', 'result': result}
+    if orjson is not None:
+        return app.response_class(orjson.dumps(payload), mimetype='application/json')
+    return jsonify(payload)
+
 
 @app.route('/results')
 def results():
@@ -165,7 +247,7 @@ def test():
         'status': 'OK',
         'ai_available': AI_AVAILABLE,
         'upload_folder': app.config['UPLOAD_FOLDER'],
-        'upload_folder_exists': os.path.exists(app.config['UPLOAD_FOLDER'])
+        'upload_folder_exists': os.path.isdir(app.config['UPLOAD_FOLDER'])
     })
 
 
@@ -185,8 +267,6 @@ def api_chat():
     try:
         # Используем GigaChat для ответа на вопросы
         if AI_AVAILABLE:
-            from agent.gigachat_client import GigaChatClient
-            giga_client = GigaChatClient()
             response = giga_client.ask_question(question, {})
         else:
             response = "AI сервис временно недоступен. Проверьте настройки GigaChat."
@@ -197,9 +277,6 @@ def api_chat():
 
 
 if __name__ == '__main__':
-    # Создаем папку для загрузок
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
     print("=" * 50)
     print("Контрактный эксперт")
     print("=" * 50)